@@ -9,6 +9,11 @@ from enum import Enum, auto
 
 import numpy as np
 
+try:
+    import numba
+except ImportError:
+    numba = None
+
 
 class SolutionStatus(Enum):
     """An enum with the three possible outcomes for a linear program."""
@@ -17,40 +22,93 @@ class SolutionStatus(Enum):
     INFEASIBLE = auto()
 
 
-def get_initial_tableau(variables, constraints, objective):
+# Integer outcome codes returned by the Simplex drivers, which are converted to `SolutionStatus` by
+# `solve_with_simplex`. Plain integers can be used inside Numba-compiled code.
+_OPTIMAL, _UNBOUNDED, _INFEASIBLE = 0, 1, 2
+_OUTCOMES = (SolutionStatus.OPTIMAL, SolutionStatus.UNBOUNDED, SolutionStatus.INFEASIBLE)
+
+
+def check_ownership(variables, used, cols):
+    """Checks that every variable used by the LP is one of its variables.
+
+    A variable created by another solver carries that solver's column index, so each index is checked to point back
+    at the variable it was read from. The check is done on all of them at once.
+
+    Args:
+        variables: The variables of the LP.
+        used: The variables of the LP's coefficients, in the order of `cols`.
+        cols: The column index of each variable in `used`.
+
+    Returns:
+        None
+
+    Raises:
+        ValueError: if a variable in `used` is not one of `variables`
+    """
+    num_vars = len(variables)
+    owners = np.empty(num_vars, dtype=object)
+    owners[:] = variables
+
+    # Comparing the lists compares their elements by identity first, so the common case needs no Python loop.
+    if np.all((cols >= 0) & (cols < num_vars)) and owners[cols].tolist() == used:
+        return
+
+    for var, col in zip(used, cols):
+        if not 0 <= col < num_vars or variables[col] is not var:
+            raise ValueError(f'variable {var.name} does not belong to this solver.')
+
+
+def get_initial_tableau(variables, constraints, objective, dtype=np.float64):
     """Produces the initial tableau for a given linear program.
 
     Args:
         variables: The variables of the LP.
         constraints: The constraints of the LP.
         objective: The objective of the LP.
+        dtype: The floating point type of the tableau.
 
     Returns:
         The linear program's initial tableau.
+
+    Raises:
+        ValueError: if a constraint or the objective uses a variable that is not one of `variables`
     """
     num_vars = len(variables)
     num_constraints = len(constraints)
 
-    b_column = np.zeros((num_constraints + 1, 1), dtype=np.float)
-    coef_matrix = np.zeros((num_constraints + 1, num_vars), dtype=np.float)
+    # Column-major, so that the column scans of the ratio test and the compiled pivot are contiguous.
+    tableau = np.zeros((num_constraints + 1, num_vars + num_constraints + 2), dtype=dtype, order='F')
+
+    # Gather the nonzero coefficients as (row, column, value) triplets, then write them all with one scatter.
+    rows, cols, vals, used = [], [], [], []
 
     for i, constraint in enumerate(constraints):
-        b_column[i, 0] = constraint.upper_bound
-        for var, coef in constraint.coefficients.items():
-            coef_matrix[i, variables[var]] = coef
+        coefficients = constraint.coefficients
+        rows.extend([i] * len(coefficients))
+        cols.extend(var._index for var in coefficients)
+        vals.extend(coefficients.values())
+        used.extend(coefficients)
 
-    for var, coef in objective.coefficients.items():
-        coef_matrix[-1, variables[var]] = -coef
+    coefficients = objective.coefficients
+    rows.extend([num_constraints] * len(coefficients))
+    cols.extend(var._index for var in coefficients)
+    vals.extend(-coef for coef in coefficients.values())
+    used.extend(coefficients)
 
-    tableau = np.hstack((
-        coef_matrix,
-        np.eye(num_constraints + 1),
-        b_column
-    ))
+    cols = np.array(cols, dtype=np.intp)
+    check_ownership(variables, used, cols)
+
+    tableau[rows, cols] = vals
+    tableau[:-1, -1] = [constraint.upper_bound for constraint in constraints]
+    np.fill_diagonal(tableau[:, num_vars:-1], 1)
 
     return tableau
 
 
+# The number of columns of the tableau that the NumPy pivot updates at a time.
+_PIVOT_BLOCK_COLUMNS = 256
+
+
 def perform_pivot(tableau, row, col):
     """Performs a pivot operation on a tableau.
 
@@ -62,15 +120,42 @@ def perform_pivot(tableau, row, col):
     Returns:
         None
     """
-    n = tableau.shape[0]
-    s = np.sign(tableau[row, col])
-
-    tableau[row, :] *= s
-
-    for i in range(n):
-        if i != row:
-            tableau[i, :] = \
-                s * (tableau[row, col] * tableau[i, :] - tableau[i, col] * tableau[row, :]) / tableau[-1, -2]
+    piv = float(tableau[row, col])
+    denom = float(tableau[-1, -2])
+    pivot_row = tableau[row].copy()
+    factors = tableau[:, col].copy()
+
+    # The pivot row is negated when the pivot is negative, which keeps the common scale of the rows, and with it
+    # `tableau[-1, -2]`, positive.
+    if piv < 0:
+        pivot_row *= -1
+        piv = -piv
+
+    # Every row but the pivot row receives a rank-one update. It is applied to blocks of `_PIVOT_BLOCK_COLUMNS`
+    # columns at a time, so the scratch space for the outer product stays small however large the tableau is.
+    if piv == denom:
+        # Rows with a zero in the pivot column and columns with a zero in the pivot row are left unchanged when the
+        # new pivot equals the previous one, so only the remaining entries are updated.
+        rows = np.flatnonzero(factors)
+        rows = rows[rows != row]
+        row_factors = factors[rows]
+        cols = np.flatnonzero(pivot_row)
+
+        for start in range(0, len(cols), _PIVOT_BLOCK_COLUMNS):
+            block_cols = cols[start:start + _PIVOT_BLOCK_COLUMNS]
+            block = np.ix_(rows, block_cols)
+            tableau[block] = (piv * tableau[block] - np.outer(row_factors, pivot_row[block_cols])) / denom
+    else:
+        buf = np.empty((tableau.shape[0], _PIVOT_BLOCK_COLUMNS), dtype=tableau.dtype, order='F')
+
+        for start in range(0, tableau.shape[1], _PIVOT_BLOCK_COLUMNS):
+            block = tableau[:, start:start + _PIVOT_BLOCK_COLUMNS]
+            update = np.outer(factors, pivot_row[start:start + _PIVOT_BLOCK_COLUMNS], out=buf[:, :block.shape[1]])
+            block *= piv
+            block -= update
+            block /= denom
+
+    tableau[row] = pivot_row
 
 
 def standardize(variables, constraints):
@@ -87,7 +172,7 @@ def standardize(variables, constraints):
     for c in constraints:
         standard_constraints.extend(c.standard_form())
 
-    for var in variables.keys():
+    for var in variables:
         standard_constraints.extend(var.standard_form())
 
     return standard_constraints
@@ -102,15 +187,14 @@ def phase_one_pivot_position(tableau):
     Returns:
         (pivot_row, pivot_col)
     """
-    prow = np.argmin(tableau[:-1, -1].flatten())
-    pcol = 0
+    prow = np.argmin(tableau[:-1, -1])
+    negative = tableau[prow, :-1] < 0
 
-    while tableau[prow, pcol] >= 0:
-        pcol += 1
-
-    if pcol >= tableau.shape[1] - 1:
+    if not negative.any():
         return None, None
 
+    pcol = np.argmax(negative)
+
     return prow, pcol
 
 
@@ -123,56 +207,212 @@ def phase_two_pivot_position(tableau):
     Returns:
         (pivot_row, pivot_col)
     """
-    prow = 0
-    pcol = 0
-
-    while tableau[-1, pcol] >= 0:
-        pcol += 1
+    negative = tableau[-1, :-1] < 0
+    pcol = np.argmax(negative)
 
-    assert pcol < tableau.shape[1] - 1
+    assert negative[pcol]
 
-    min_pos_bratio = np.inf
+    # Minimum ratio test over the rows with a positive entry in the pivot column. Every row shares the positive scale
+    # `tableau[-1, -2]`, so the signs of the entries are those of the values they represent.
+    col = tableau[:-1, pcol]
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        bratios = np.where(col > 0, tableau[:-1, -1] / col, np.inf)
 
-    for i, row in enumerate(tableau[:-1]):
-        bratio = 0 if row[pcol] == 0 else row[-1] / row[pcol]
-        if bratio > 0 and bratio < min_pos_bratio:
-            min_pos_bratio = bratio
-            prow = i
+    prow = np.argmin(bratios)
 
-    if min_pos_bratio == np.inf:
+    if bratios[prow] == np.inf:
         return None, None
 
     return prow, pcol
 
 
-def simplex(tableau):
-    """Executes the simple version of the Simplex algorithm.
+def _simplex_numpy(tableau, pivot=perform_pivot):
+    """Executes the simple version of the Simplex algorithm using NumPy operations.
+
+    This is the fallback used when Numba is not available.
 
     Args:
         tableau: The initial tableau to be solved.
+        pivot: The function used to perform each pivot operation.
 
     Returns:
-        One of the outcomes contained in `SolutionStatus`.
+        One of `_OPTIMAL`, `_UNBOUNDED` and `_INFEASIBLE`.
     """
     # Phase I
     while tableau[:-1, -1].min() < 0:
         prow, pcol = phase_one_pivot_position(tableau)
 
         if prow is None:
-            return SolutionStatus.INFEASIBLE
+            return _INFEASIBLE
 
-        perform_pivot(tableau, prow, pcol)
+        pivot(tableau, prow, pcol)
 
     # Phase II
     while tableau[-1, :-1].min() < 0:
         prow, pcol = phase_two_pivot_position(tableau)
 
         if prow is None:
-            return SolutionStatus.UNBOUNDED
+            return _UNBOUNDED
+
+        pivot(tableau, prow, pcol)
 
-        perform_pivot(tableau, prow, pcol)
+    return _OPTIMAL
 
-    return SolutionStatus.OPTIMAL
+
+def _perform_pivot_jit(tableau, row, col):
+    """Performs a pivot operation on a tableau with explicit loops.
+
+    The update is applied one column at a time so that the inner loop is contiguous for the column-major tableaux
+    produced by `get_initial_tableau`.
+
+    Args:
+        tableau: The tableau to be operated on.
+        row: The row of the pivot operation.
+        col: The column of the pivot operation.
+
+    Returns:
+        None
+    """
+    n, m = tableau.shape
+    s = 1.0 if tableau[row, col] > 0 else -1.0
+
+    # The pivot row is negated when the pivot is negative, which keeps the common scale of the rows positive. It is
+    # strided in a column-major tableau and is read once per column, so it is gathered into a contiguous
+    # buffer. The pivot column is overwritten part way through the update, so it is kept aside too.
+    pivot_row = tableau[row, :] * s
+    tableau[row, :] = pivot_row
+    factors = tableau[:, col].copy()
+
+    piv = pivot_row[col]
+    denom = tableau[n - 1, m - 2]
+
+    # Rows with a zero in the pivot column and columns with a zero in the pivot row only need to be rescaled, which
+    # is a no-op when the new pivot equals the previous one. In that case only the remaining rows are updated.
+    unit_scale = piv == denom
+    active_rows = np.empty(n, dtype=np.int64)
+    num_active = 0
+
+    if unit_scale:
+        for i in range(n):
+            if i != row and factors[i] != 0.0:
+                active_rows[num_active] = i
+                num_active += 1
+
+    # Columns are independent of one another, so this loop runs across threads in the parallel variant.
+    for j in numba.prange(m):
+        r = pivot_row[j]
+
+        if unit_scale:
+            if r == 0.0:
+                continue
+
+            for k in range(num_active):
+                i = active_rows[k]
+                tableau[i, j] = (piv * tableau[i, j] - factors[i] * r) / denom
+        else:
+            for i in range(row):
+                tableau[i, j] = (piv * tableau[i, j] - factors[i] * r) / denom
+            for i in range(row + 1, n):
+                tableau[i, j] = (piv * tableau[i, j] - factors[i] * r) / denom
+
+
+def _simplex_jit(tableau):
+    """Executes the simple version of the Simplex algorithm with explicit loops, for compilation with Numba.
+
+    Args:
+        tableau: The initial tableau to be solved, as a 2-D floating point array.
+
+    Returns:
+        One of `_OPTIMAL`, `_UNBOUNDED` and `_INFEASIBLE`.
+    """
+    n, m = tableau.shape
+
+    # The optimality checks are fused into the pivot searches, so each iteration scans the b column and the
+    # objective row once.
+
+    # Phase I
+    while True:
+        prow = np.argmin(tableau[:-1, -1])
+
+        if tableau[prow, m - 1] >= 0:
+            break
+
+        pcol = -1
+
+        for j in range(m - 1):
+            if tableau[prow, j] < 0:
+                pcol = j
+                break
+
+        if pcol < 0:
+            return _INFEASIBLE
+
+        _perform_pivot_jit(tableau, prow, pcol)
+
+    # Phase II
+    while True:
+        prow = -1
+        pcol = -1
+
+        for j in range(m - 1):
+            if tableau[n - 1, j] < 0:
+                pcol = j
+                break
+
+        if pcol < 0:
+            break
+
+        min_bratio = np.inf
+
+        for i in range(n - 1):
+            if tableau[i, pcol] > 0:
+                bratio = tableau[i, m - 1] / tableau[i, pcol]
+                if bratio < min_bratio:
+                    min_bratio = bratio
+                    prow = i
+
+        if prow < 0:
+            return _UNBOUNDED
+
+        _perform_pivot_jit(tableau, prow, pcol)
+
+    return _OPTIMAL
+
+
+# Tableaux with at least this many entries are pivoted across threads. Below it, starting the thread pool
+# costs more than the pivot itself.
+_PARALLEL_MIN_ENTRIES = 1 << 16
+
+if numba is not None:
+    # Numba's cache does not tell parallel and serial compilations of the same function apart, so only the serial
+    # variant is cached. The parallel one is compiled the first time a large tableau is solved.
+    # No fast-math flags are enabled, not even contraction into fused multiply-adds, so that the compiled pivot
+    # rounds exactly like the NumPy one and both backends produce bit-identical tableaux.
+    _perform_pivot_parallel_jit = numba.njit(parallel=True)(_perform_pivot_jit)
+    _perform_pivot_jit = numba.njit(cache=True)(_perform_pivot_jit)
+    _simplex_jit = numba.njit(cache=True)(_simplex_jit)
+
+
+def simplex(tableau):
+    """Executes the simple version of the Simplex algorithm.
+
+    The compiled implementation is used when Numba is installed; otherwise this falls back to NumPy. On large
+    tableaux, where the pivots dominate the running time, the iterations are driven from Python so that each pivot
+    can run in parallel.
+
+    Args:
+        tableau: The initial tableau to be solved.
+
+    Returns:
+        One of `_OPTIMAL`, `_UNBOUNDED` and `_INFEASIBLE`.
+    """
+    if numba is None:
+        return _simplex_numpy(tableau)
+
+    if tableau.size >= _PARALLEL_MIN_ENTRIES:
+        return _simplex_numpy(tableau, _perform_pivot_parallel_jit)
+
+    return _simplex_jit(tableau)
 
 
 def get_results(tableau, variables, objective):
@@ -190,17 +430,19 @@ def get_results(tableau, variables, objective):
     """
     objective._solution_value = tableau[-1, -1] / tableau[-1, -2]
 
-    for var, i in variables.items():
-        nonzero = np.nonzero(tableau[:, i])[0]
-        if len(nonzero) > 1:
-            var._solution_value = 0
-            continue
+    # A variable is basic if its column has exactly one nonzero entry; all other variables are zero.
+    nonzero = tableau[:, :len(variables)] != 0
+    basic = np.flatnonzero(np.count_nonzero(nonzero, axis=0) == 1)
+    rows = np.argmax(nonzero[:, basic], axis=0)
 
-        j = nonzero[0]
-        var._solution_value = tableau[j, -1] / tableau[j, i]
+    values = np.zeros(len(variables))
+    values[basic] = tableau[rows, -1] / tableau[rows, basic]
 
+    for var in variables:
+        var._solution_value = values[var._index]
 
-def solve_with_simplex(variables, constraints, objective):
+
+def solve_with_simplex(variables, constraints, objective, dtype=np.float64):
     """Solves a linear program using the Simplex algorithm.
 
     The arguments to this method should come directly from a `Solver`.
@@ -209,15 +451,19 @@ def solve_with_simplex(variables, constraints, objective):
         variables: The variables of the LP.
         constraints: The constraints of the LP.
         objective: The objective of the LP.
+        dtype: The floating point type of the tableau.
 
     Returns:
         One of the outcomes contained in `SolutionStatus`.
+
+    Raises:
+        ValueError: if a constraint or the objective uses a variable that is not one of `variables`
     """
     constraints = standardize(variables, constraints)
-    tableau = get_initial_tableau(variables, constraints, objective)
+    tableau = get_initial_tableau(variables, constraints, objective, dtype)
     outcome = simplex(tableau)
 
-    if outcome == SolutionStatus.OPTIMAL:
+    if outcome == _OPTIMAL:
         get_results(tableau, variables, objective)
 
-    return outcome
+    return _OUTCOMES[outcome]
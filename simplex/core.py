@@ -25,15 +25,30 @@ class Solver:
     INFEASIBLE = SolutionStatus.INFEASIBLE
     OPTIMAL = SolutionStatus.OPTIMAL
 
-    def __init__(self):
-        self._vars = dict()
-        self._constraints = set()
+    def __init__(self, dtype=np.float64):
+        """Creates an empty linear program.
+
+        Args:
+            dtype: The floating point type used for the Simplex tableau, either `np.float64` or `np.float32`.
+                `np.float32` halves the memory traffic of each pivot, but is only appropriate for small, well-scaled
+                problems.
+
+        Raises:
+            ValueError: if `dtype` is neither `np.float64` nor `np.float32`
+        """
+        if np.dtype(dtype) not in (np.float64, np.float32):
+            raise ValueError(f'tableau dtype must be float64 or float32, not {np.dtype(dtype).name}.')
+
+        self._dtype = dtype
+        self._vars = []
+        self._var_names = set()
+        self._constraints = []
         self._objective = None
 
     @property
     def variables(self):
         """An iterable containing the solver's variables."""
-        return self._vars.keys()
+        return tuple(self._vars)
 
     def add_variable(self, name, upper_bound=INFINITY):
         """Adds a variable to the linear program.
@@ -48,12 +63,14 @@ class Solver:
         Raises:
             ValueError: if a variable with the provided name already exists for this solver
         """
-        var = Variable(name, upper_bound)
-
-        if var in self._vars:
+        if name in self._var_names:
             raise ValueError(f'this solver already has the variable: {name}')
 
-        self._vars[var] = len(self._vars)
+        var = Variable(name, upper_bound)
+        var._index = len(self._vars)
+
+        self._vars.append(var)
+        self._var_names.add(name)
         return var
 
     def add_constraint(self, lower_bound, upper_bound):
@@ -67,7 +84,7 @@ class Solver:
             The newly created constraint.
         """
         constraint = Constraint(lower_bound, upper_bound)
-        self._constraints.add(constraint)
+        self._constraints.append(constraint)
         return constraint
 
     def objective(self):
@@ -91,8 +108,11 @@ class Solver:
 
         Returns:
             The program's solution status. Will be one of `Solver.OPTIMAL`, `Solver.UNBOUNDED`, and `Solver.INFEASIBLE`.
+
+        Raises:
+            ValueError: if a constraint or the objective uses a variable that was added to a different solver
         """
-        return solve_with_simplex(self._vars, self._constraints, self._objective)
+        return solve_with_simplex(self._vars, self._constraints, self._objective, self._dtype)
 
 
 class Variable:
@@ -110,6 +130,8 @@ class Variable:
         self.name = name
         self.upper_bound = upper_bound
         self._solution_value = None
+        # The variable's column in the tableau, set by `Solver.add_variable`.
+        self._index = -1
 
     def standard_form(self):
         constraints = []
@@ -153,6 +175,9 @@ class Constraint:
 
         self._coefficients = dict() if coefficients is None else coefficients
 
+        # Cached result of `standard_form`, cleared whenever a coefficient changes.
+        self._standard_form = None
+
     @property
     def lower_bound(self):
         """The lower bound for this variable's value."""
@@ -185,6 +210,7 @@ class Constraint:
             raise TypeError('provided variable is not of the `Variable` type.')
 
         self._coefficients[variable] = value
+        self._standard_form = None
 
     def standard_form(self):
         """Converts this constraint into the equivalent constraints that are in standard form.
@@ -192,23 +218,30 @@ class Constraint:
         Returns:
             A list of constraints which are in standard form and, taken altogether, are equivalent to this constraint.
         """
-        if self._lower_bound == -Solver.INFINITY and self._upper_bound != Solver.INFINITY:
-            return [self]
+        if self._lower_bound == -Solver.INFINITY and self._upper_bound == Solver.INFINITY:
+            print('\033[93mWarning: using constraint with no bounds has no effect.\033[0m')
 
-        if self._lower_bound != -Solver.INFINITY and self._upper_bound == Solver.INFINITY:
-            new_coefs = copy(self._coefficients)
-            for key in new_coefs.keys():
-                new_coefs[key] = -new_coefs[key]
+        if self._standard_form is None:
+            self._standard_form = self._compute_standard_form()
 
-            return [Constraint(-Solver.INFINITY, -self._lower_bound, new_coefs)]
+        return list(self._standard_form)
 
-        if self._lower_bound != -Solver.INFINITY and self._upper_bound != Solver.INFINITY:
-            return [*Constraint(-Solver.INFINITY, self._upper_bound, copy(self._coefficients)).standard_form(),
-                    *Constraint(self._lower_bound, Solver.INFINITY, copy(self._coefficients)).standard_form()]
+    def _compute_standard_form(self):
+        inf = Solver.INFINITY
+        lower_bound, upper_bound = self._lower_bound, self._upper_bound
+        constraints = []
 
-        if self._lower_bound == -Solver.INFINITY and self._upper_bound == Solver.INFINITY:
-            print('\033[93mWarning: using constraint with no bounds has no effect.\033[0m')
-            return []
+        if upper_bound != inf:
+            if lower_bound == -inf:
+                return [self]
+
+            constraints.append(Constraint(-inf, upper_bound, self._coefficients))
+
+        if lower_bound != -inf:
+            negated = {var: -coef for var, coef in self._coefficients.items()}
+            constraints.append(Constraint(-inf, -lower_bound, negated))
+
+        return constraints
 
 
 class Objective:
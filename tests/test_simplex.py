@@ -1,13 +1,27 @@
+import itertools
+
+import numpy as np
 import pytest
 
-from simplex import Solver
+from simplex import Solver, _simplex
 
 TIMEOUT = 5
 
 
+@pytest.fixture(params=['numba', 'numpy'])
+def backend(request, monkeypatch):
+    if request.param == 'numba' and _simplex.numba is None:
+        pytest.skip('numba is not installed')
+    if request.param == 'numpy':
+        monkeypatch.setattr(_simplex, 'numba', None)
+    return request.param
+
+
+@pytest.mark.usefixtures('backend')
 @pytest.mark.timeout(TIMEOUT)
-def test_lp1():
-    solver = Solver()
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_lp1(dtype):
+    solver = Solver(dtype)
 
     x = solver.add_variable('x', Solver.INFINITY)
     y = solver.add_variable('y', Solver.INFINITY)
@@ -36,6 +50,7 @@ def test_lp1():
     assert y.solution_value == 4.0
 
 
+@pytest.mark.usefixtures('backend')
 @pytest.mark.timeout(TIMEOUT)
 def test_lp2():
     solver = Solver()
@@ -67,6 +82,7 @@ def test_lp2():
     assert y.solution_value == 28
 
 
+@pytest.mark.usefixtures('backend')
 @pytest.mark.timeout(TIMEOUT)
 def test_lp3():
     solver = Solver()
@@ -94,6 +110,7 @@ def test_lp3():
     assert y.solution_value == 30
 
 
+@pytest.mark.usefixtures('backend')
 @pytest.mark.timeout(TIMEOUT)
 def test_lp4():
     solver = Solver()
@@ -123,7 +140,236 @@ def test_lp4():
 
     status = solver.solve()
 
-    assert status == Solver.UNBOUNDED
+    assert status == Solver.INFEASIBLE
     assert objective.solution_value is None
     assert x.solution_value is None
     assert y.solution_value is None
+
+
+@pytest.mark.usefixtures('backend')
+@pytest.mark.timeout(TIMEOUT)
+def test_lp5():
+    solver = Solver()
+
+    x = solver.add_variable('x', Solver.INFINITY)
+    y = solver.add_variable('y', Solver.INFINITY)
+
+    constraint0 = solver.add_constraint(-Solver.INFINITY, 0)
+    constraint0.set_coefficient(x, 1)
+
+    constraint1 = solver.add_constraint(-Solver.INFINITY, 10)
+    constraint1.set_coefficient(x, 1)
+    constraint1.set_coefficient(y, 1)
+
+    objective = solver.objective()
+    objective.set_coefficient(x, 1)
+
+    status = solver.solve()
+
+    assert status == Solver.OPTIMAL
+    assert objective.solution_value == 0
+    assert x.solution_value == 0
+
+
+@pytest.mark.usefixtures('backend')
+@pytest.mark.timeout(TIMEOUT)
+def test_lp6():
+    solver = Solver()
+
+    x = solver.add_variable('x', Solver.INFINITY)
+    y = solver.add_variable('y', Solver.INFINITY)
+
+    constraint0 = solver.add_constraint(-Solver.INFINITY, 5)
+    constraint0.set_coefficient(x, 1)
+    constraint0.set_coefficient(y, -1)
+
+    constraint1 = solver.add_constraint(2, Solver.INFINITY)
+    constraint1.set_coefficient(x, 1)
+
+    objective = solver.objective()
+    objective.set_coefficient(x, 1)
+    objective.set_coefficient(y, 1)
+
+    status = solver.solve()
+
+    assert status == Solver.UNBOUNDED
+    assert objective.solution_value is None
+
+
+def test_duplicate_variable():
+    solver = Solver()
+    solver.add_variable('x')
+
+    with pytest.raises(ValueError):
+        solver.add_variable('x')
+
+
+@pytest.mark.parametrize('in_objective', [False, True])
+def test_variable_from_other_solver(in_objective):
+    solver = Solver()
+    x = solver.add_variable('x')
+    y = Solver().add_variable('y')
+
+    constraint = solver.add_constraint(-Solver.INFINITY, 1)
+    constraint.set_coefficient(x if in_objective else y, 1)
+    objective = solver.objective()
+    objective.set_coefficient(y if in_objective else x, 1)
+
+    with pytest.raises(ValueError):
+        solver.solve()
+
+
+@pytest.mark.parametrize('dtype', [np.int64, np.bool_, np.complex128, np.float16, np.longdouble])
+def test_non_floating_dtype(dtype):
+    with pytest.raises(ValueError):
+        Solver(dtype)
+
+
+@pytest.mark.timeout(TIMEOUT)
+def test_resolve_after_coefficient_change():
+    solver = Solver()
+
+    x = solver.add_variable('x', Solver.INFINITY)
+
+    constraint0 = solver.add_constraint(0, 4)
+    constraint0.set_coefficient(x, 1)
+
+    objective = solver.objective()
+    objective.set_coefficient(x, 1)
+
+    assert solver.solve() == Solver.OPTIMAL
+    assert x.solution_value == 4
+
+    constraint0.set_coefficient(x, 2)
+
+    assert solver.solve() == Solver.OPTIMAL
+    assert x.solution_value == 2
+
+
+def test_unbounded_constraint_warns_on_every_solve(capsys):
+    solver = Solver()
+
+    x = solver.add_variable('x', 3)
+
+    constraint0 = solver.add_constraint(-Solver.INFINITY, Solver.INFINITY)
+    constraint0.set_coefficient(x, 1)
+
+    objective = solver.objective()
+    objective.set_coefficient(x, 1)
+
+    for _ in range(2):
+        assert solver.solve() == Solver.OPTIMAL
+        assert 'no bounds' in capsys.readouterr().out
+
+
+@pytest.mark.skipif(_simplex.numba is None, reason='numba is not installed')
+@pytest.mark.parametrize('shape', [(3, 6), (8, 12), (9, 14), (17, 30)])
+def test_pivot_backends_agree(shape):
+    rng = np.random.default_rng(sum(shape))
+    tableau = np.asfortranarray(rng.integers(-5, 6, shape).astype(np.float64))
+
+    # A pivot of -3 against a previous pivot of 3 exercises the in-place negation of the pivot row.
+    for row, col, pivot in [(1, 2, -3), (0, 0, 2), (shape[0] - 2, 1, -5)]:
+        tableau[-1, -2] = 3
+        tableau[row, col] = pivot
+        expected = tableau.copy(order='F')
+        _simplex._perform_pivot_jit(expected, row, col)
+        _simplex.perform_pivot(tableau, row, col)
+
+        np.testing.assert_array_equal(tableau, expected)
+
+
+def brute_force_optimum(a, b, c):
+    """Maximizes `c @ x` subject to `a @ x <= b` by enumerating vertices; returns None if infeasible."""
+    best = None
+    for rows in itertools.combinations(range(len(a)), a.shape[1]):
+        rows = list(rows)
+        if abs(np.linalg.det(a[rows])) < 1e-9:
+            continue
+
+        x = np.linalg.solve(a[rows], b[rows])
+        if np.all(a @ x <= b + 1e-7):
+            best = c @ x if best is None else max(best, c @ x)
+
+    return best
+
+
+@pytest.mark.usefixtures('backend')
+@pytest.mark.timeout(4 * TIMEOUT)
+def test_random_lps():
+    rng = np.random.default_rng(0)
+    num_vars, num_constraints = 4, 4
+
+    for _ in range(40):
+        coefs = rng.integers(-5, 6, (num_constraints, num_vars))
+        lower_bounds = rng.integers(-5, 10, num_constraints)
+        widths = rng.choice([0, 5, Solver.INFINITY], num_constraints)
+        has_lower = rng.random(num_constraints) < 0.5
+        upper_bounds = rng.integers(1, 10, num_vars)
+        costs = rng.integers(-5, 10, num_vars)
+
+        solver = Solver()
+        xs = [solver.add_variable(f'x{i}', ub) for i, ub in enumerate(upper_bounds)]
+
+        # Collect the same LP as `a @ x <= b` for the brute force reference, including the variables' bounds.
+        a, b = [], []
+        for coef, lb, width, lower in zip(coefs, lower_bounds, widths, has_lower):
+            lb, ub = (lb, lb + width) if lower else (-Solver.INFINITY, lb)
+            constraint = solver.add_constraint(lb, ub)
+            for x, value in zip(xs, coef):
+                constraint.set_coefficient(x, value)
+
+            if ub != Solver.INFINITY:
+                a.append(coef)
+                b.append(ub)
+            if lb != -Solver.INFINITY:
+                a.append(-coef)
+                b.append(-lb)
+
+        a.extend(np.eye(num_vars))
+        b.extend(upper_bounds)
+        a.extend(-np.eye(num_vars))
+        b.extend(np.zeros(num_vars))
+
+        objective = solver.objective()
+        for x, value in zip(xs, costs):
+            objective.set_coefficient(x, value)
+
+        expected = brute_force_optimum(np.array(a, dtype=float), np.array(b, dtype=float), costs)
+        status = solver.solve()
+
+        if expected is None:
+            assert status == Solver.INFEASIBLE
+        else:
+            assert status == Solver.OPTIMAL
+            assert objective.solution_value == pytest.approx(expected)
+            values = np.array([x.solution_value for x in xs])
+            assert np.all(np.array(a) @ values <= np.array(b) + 1e-7)
+
+
+@pytest.mark.skipif(_simplex.numba is None, reason='numba is not installed')
+@pytest.mark.timeout(4 * TIMEOUT)
+def test_parallel_pivot_matches_serial(monkeypatch):
+    def solve():
+        rng = np.random.default_rng(1)
+        solver = Solver()
+        xs = [solver.add_variable(f'x{i}', int(rng.integers(1, 20))) for i in range(12)]
+
+        for _ in range(10):
+            constraint = solver.add_constraint(int(rng.integers(-5, 5)), int(rng.integers(10, 50)))
+            for x in xs:
+                constraint.set_coefficient(x, int(rng.integers(-4, 6)))
+
+        objective = solver.objective()
+        for x in xs:
+            objective.set_coefficient(x, int(rng.integers(-3, 9)))
+
+        return solver.solve(), objective.solution_value, [x.solution_value for x in xs]
+
+    serial = solve()
+    monkeypatch.setattr(_simplex, '_PARALLEL_MIN_ENTRIES', 0)
+    parallel = solve()
+
+    assert _simplex._perform_pivot_parallel_jit.signatures
+    assert serial[0] == Solver.OPTIMAL
+    assert parallel == serial